@@ -3,6 +3,9 @@ import json
 import sys
 import os
 
+from level_codec import encode_level, is_encoded, iter_tiles
+from text_cache import get_font, render_text
+
 pygame.init()
 
 # Constants
@@ -14,7 +17,7 @@ TILE_SIZE = 24
 screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 pygame.display.set_caption("Pygame Level Editor")
 
-font = pygame.font.SysFont("Arial", 18)
+font = get_font("Arial", 18)
 background_image = pygame.image.load("assets/background/background.png").convert()
 background_image = pygame.transform.scale(background_image, (WINDOW_WIDTH, WINDOW_HEIGHT))
 # Load assets
@@ -35,17 +38,25 @@ for filename in os.listdir(img_folder_path):
         path = os.path.join(img_folder_path, f"{name}{os.path.splitext(filename)[1]}")
         assets[name] = load_scaled(path, (TILE_SIZE, TILE_SIZE))
 
-# Scale images for panel display
-asset_panel_items = []
-y_offset = 10
-x_offset = 10
-for name, img in assets.items():
-    rect = pygame.Rect(x_offset, y_offset, TILE_SIZE, TILE_SIZE)
-    asset_panel_items.append((name, img, rect))
-    y_offset += 30
-    if y_offset >= WINDOW_HEIGHT:
-        x_offset += 30
-        y_offset = 10
+# Asset palette layout: search box, most-recently-used row, then a scrollable icon grid
+ICON_SPACING = 30
+PALETTE_X = 10
+PALETTE_COLS = (PANEL_WIDTH - PALETTE_X) // ICON_SPACING
+SEARCH_RECT = pygame.Rect(PALETTE_X, 8, PANEL_WIDTH - 2 * PALETTE_X, 22)
+MRU_TOP = 38
+PALETTE_TOP = MRU_TOP + ICON_SPACING + 8
+PALETTE_BOTTOM = WINDOW_HEIGHT - 70
+PALETTE_ROWS = (PALETTE_BOTTOM - PALETTE_TOP) // ICON_SPACING
+
+asset_names = sorted(assets)
+filtered_names = asset_names  # names matching search_query, in palette order
+search_query = ""
+search_active = False
+scroll_row = 0
+recent_assets = []  # most recently used first, at most PALETTE_COLS entries
+
+palette_surface = pygame.Surface((PANEL_WIDTH, WINDOW_HEIGHT))
+palette_dirty = True
 
 selected_asset = None
 delete_mode = False
@@ -53,16 +64,108 @@ placed_tiles = []  # [{asset:'grass_block', x:5, y:3}, ...]
 LEVEL_FILE = "level_data.json"  # Use a constant for file name
 
 
+def set_search_query(query):
+    global search_query, filtered_names, scroll_row, palette_dirty
+    query = query.lower()
+    if query == search_query:
+        return
+    # Typing more characters only narrows the previous result, so filter that instead of everything
+    source = filtered_names if search_query and query.startswith(search_query) else asset_names
+    filtered_names = [name for name in source if query in name.lower()] if query else asset_names
+    search_query = query
+    scroll_row = 0
+    palette_dirty = True
+
+
+def max_scroll_row():
+    total_rows = (len(filtered_names) + PALETTE_COLS - 1) // PALETTE_COLS
+    return max(0, total_rows - PALETTE_ROWS)
+
+
+def scroll_palette(rows):
+    global scroll_row, palette_dirty
+    new_row = min(max(scroll_row + rows, 0), max_scroll_row())
+    if new_row != scroll_row:
+        scroll_row = new_row
+        palette_dirty = True
+
+
+def select_asset(name):
+    global selected_asset, palette_dirty
+    selected_asset = name
+    if name in recent_assets:
+        recent_assets.remove(name)
+    recent_assets.insert(0, name)
+    del recent_assets[PALETTE_COLS:]
+    palette_dirty = True
+
+
+def palette_asset_at(mx, my):
+    # Work out the icon under the mouse directly from its coordinates, no per-item hit tests
+    col = (mx - PALETTE_X) // ICON_SPACING
+    if mx < PALETTE_X or col >= PALETTE_COLS or (mx - PALETTE_X) % ICON_SPACING >= TILE_SIZE:
+        return None
+
+    if MRU_TOP <= my < MRU_TOP + TILE_SIZE:
+        return recent_assets[col] if col < len(recent_assets) else None
+
+    if PALETTE_TOP <= my < PALETTE_TOP + PALETTE_ROWS * ICON_SPACING:
+        row = (my - PALETTE_TOP) // ICON_SPACING
+        if (my - PALETTE_TOP) % ICON_SPACING >= TILE_SIZE:
+            return None
+        index = (scroll_row + row) * PALETTE_COLS + col
+        if index < len(filtered_names):
+            return filtered_names[index]
+    return None
+
+
+def draw_palette_icon(name, x, y):
+    palette_surface.blit(assets[name], (x, y))
+    if selected_asset == name:
+        pygame.draw.rect(palette_surface, (255, 255, 0), (x, y, TILE_SIZE, TILE_SIZE), 2)
+
+
+def redraw_palette():
+    global palette_dirty
+    palette_surface.fill((50, 50, 50))
+
+    # Search box
+    pygame.draw.rect(palette_surface, (30, 30, 30), SEARCH_RECT)
+    pygame.draw.rect(palette_surface, (255, 255, 0) if search_active else (120, 120, 120), SEARCH_RECT, 1)
+    label = search_query + "_" if search_active else (search_query or "Search (/)")
+    palette_surface.blit(render_text(label, font, (255, 255, 255)), (SEARCH_RECT.x + 4, SEARCH_RECT.y + 1))
+
+    # Most recently used row
+    for col, name in enumerate(recent_assets):
+        draw_palette_icon(name, PALETTE_X + col * ICON_SPACING, MRU_TOP)
+    pygame.draw.line(palette_surface, (90, 90, 90), (PALETTE_X, PALETTE_TOP - 5), (PANEL_WIDTH - PALETTE_X, PALETTE_TOP - 5))
+
+    # Only the rows currently scrolled into view
+    start = scroll_row * PALETTE_COLS
+    visible = filtered_names[start:start + PALETTE_ROWS * PALETTE_COLS]
+    for i, name in enumerate(visible):
+        row, col = divmod(i, PALETTE_COLS)
+        draw_palette_icon(name, PALETTE_X + col * ICON_SPACING, PALETTE_TOP + row * ICON_SPACING)
+
+    # Scrollbar
+    total_rows = (len(filtered_names) + PALETTE_COLS - 1) // PALETTE_COLS
+    if total_rows > PALETTE_ROWS:
+        track_h = PALETTE_ROWS * ICON_SPACING
+        thumb_h = max(10, track_h * PALETTE_ROWS // total_rows)
+        thumb_y = PALETTE_TOP + (track_h - thumb_h) * scroll_row // max_scroll_row()
+        pygame.draw.rect(palette_surface, (150, 150, 150), (PANEL_WIDTH - 6, thumb_y, 4, thumb_h))
+
+    palette_dirty = False
+
+
 def draw_panel():
-    pygame.draw.rect(screen, (50, 50, 50), (0, 0, PANEL_WIDTH, WINDOW_HEIGHT))
-    for name, icon, rect in asset_panel_items:
-        screen.blit(icon, rect.topleft)
-        if selected_asset == name:
-            pygame.draw.rect(screen, (255, 255, 0), rect, 2)
+    if palette_dirty:
+        redraw_palette()
+    screen.blit(palette_surface, (0, 0))
 
-    delete_text = font.render("DELETE MODE: ON (D)" if delete_mode else "DELETE MODE: OFF (D)", True, (255, 255, 255))
+    delete_text = render_text("DELETE MODE: ON (D)" if delete_mode else "DELETE MODE: OFF (D)", font, (255, 255, 255))
     screen.blit(delete_text, (20, WINDOW_HEIGHT - 60))
-    save_text = font.render("Press S to Save Level", True, (255, 255, 255))
+    save_text = render_text("Press S to Save Level", font, (255, 255, 255))
     screen.blit(save_text, (20, WINDOW_HEIGHT - 40))
 
 
@@ -82,11 +185,8 @@ def draw_tiles():
 def save_level():
     global placed_tiles
 
-    # 1. Format the current level data
-    new_level_data = [
-        {'asset': tile['asset'], 'x': tile['x'], 'y': tile['y']}
-        for tile in placed_tiles
-    ]
+    # 1. Encode the current level as run-length chunks
+    new_level_data = encode_level((tile['asset'], tile['x'], tile['y']) for tile in placed_tiles)
 
     # 2. Read existing levels from the file
     all_levels = []
@@ -103,12 +203,15 @@ def save_level():
         print("Warning: JSON data is not a list. Starting new list.")
         all_levels = []
 
-    # 3. Append the new level data
+    # 3. Re-encode any levels still in the old per-tile format, then append the new one
+    all_levels = [level if is_encoded(level) else encode_level(iter_tiles(level)) for level in all_levels]
     all_levels.append(new_level_data)
 
-    # 4. Write the entire list back
-    with open(LEVEL_FILE, "w") as f:
-        json.dump(all_levels, f, indent=4)
+    # 4. Write the entire list back, swapping the file in whole so a running game never reads half of it
+    tmp_file = LEVEL_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(all_levels, f, separators=(",", ":"))
+    os.replace(tmp_file, LEVEL_FILE)
 
     print(f"Level {len(all_levels)} saved successfully to {LEVEL_FILE}.")
     # Clear placed tiles so the user can immediately start designing the next level
@@ -129,9 +232,16 @@ while running:
 
             # Click inside asset panel
             if mx < PANEL_WIDTH:
-                for name, icon, rect in asset_panel_items:
-                    if rect.collidepoint(mx, my):
-                        selected_asset = name
+                # Mouse wheel arrives as buttons 4/5
+                if event.button in (4, 5):
+                    scroll_palette(-1 if event.button == 4 else 1)
+                    continue
+                if search_active != SEARCH_RECT.collidepoint(mx, my):
+                    search_active = not search_active
+                    palette_dirty = True
+                name = palette_asset_at(mx, my)
+                if name:
+                    select_asset(name)
                 continue
 
             # Click inside canvas
@@ -152,8 +262,23 @@ while running:
                 if selected_asset:
                     placed_tiles.append({'asset': selected_asset, 'x': grid_x, 'y': grid_y})
 
+        # Typing into the asset search box
+        if event.type == pygame.KEYDOWN and search_active:
+            if event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
+                search_active = False
+                palette_dirty = True
+            elif event.key == pygame.K_BACKSPACE:
+                set_search_query(search_query[:-1])
+            elif event.unicode and event.unicode.isprintable():
+                set_search_query(search_query + event.unicode)
+            palette_dirty = True
+            continue
+
         # Key press
         if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SLASH:
+                search_active = True
+                palette_dirty = True
             if event.key == pygame.K_s:
                 save_level()
             if event.key == pygame.K_d:
@@ -4,6 +4,12 @@ import sys
 import os
 import math
 import random
+import tracemalloc
+from collections import Counter
+
+from level_codec import iter_runs, iter_tiles
+from level_nav import NavGraph
+from text_cache import get_font, render_text
 
 pygame.init()
 
@@ -43,6 +49,10 @@ BULLET_SIZE = 6
 LEVEL_FILE = "level_data.json"
 ALL_LEVELS = [] # List to hold all level data from JSON
 CURRENT_LEVEL_INDEX = 0
+LEVEL_WATCH_INTERVAL = 30  # frames between checks of the level file for hot-reload
+
+# Run with --measure-alloc to print per-frame allocation stats from tracemalloc once a second
+MEASURE_ALLOCATIONS = "--measure-alloc" in sys.argv
 
 screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 pygame.display.set_caption("Platformer with Enemies & Health")
@@ -76,10 +86,40 @@ if os.path.isdir(img_folder_path):
 
 
 
+# -----------------------
+# BULLET POOL
+# -----------------------
+# Bullets are dicts {x,y,vx,vy,rect,owner,damage}; spent ones go back to the pool with their
+# Rect so steady-state shooting doesn't allocate
+bullet_pool = []
+
+
+def spawn_bullet(bullets, x, y, vx, vy, owner, damage=0):
+    if bullet_pool:
+        b = bullet_pool.pop()
+    else:
+        b = {"rect": pygame.Rect(0, 0, BULLET_SIZE, BULLET_SIZE)}
+    b["x"] = x
+    b["y"] = y
+    b["vx"] = vx
+    b["vy"] = vy
+    b["owner"] = owner
+    b["damage"] = damage
+    b["rect"].x = x
+    b["rect"].y = y
+    bullets.append(b)
+
+
+def clear_bullets(bullets):
+    bullet_pool.extend(bullets)
+    bullets.clear()
+
+
 class Enemy:
     def __init__(self, x, y, image=None):
         # x,y are in pixels (tile coords * TILE_SIZE)
         self.rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
+        self.spawn = (x, y)  # where the level placed this enemy, used to match it on hot-reload
         self.image = image
         self.dir = -1 if random.random() < 0.5 else 1  # start left or right
         self.speed = ENEMY_SPEED
@@ -88,40 +128,38 @@ class Enemy:
         # --- NEW ENEMY ATTRIBUTES ---
         self.health = ENEMY_MAX_HEALTH
         self.max_health = ENEMY_MAX_HEALTH
+        # Pixel bounds to patrol between, set from the level's nav graph
+        self.segment = None
+        self.patrol_left = self.rect.left
+        self.patrol_right = self.rect.right
 
     def take_damage(self, damage):
         self.health -= damage
         if self.health <= 0:
             self.alive = False
 
-    def update_patrol(self, tiles):
-        # Horizontal movement and reversing on wall collision or edge of platform
-        self.rect.x += int(self.dir * self.speed)
-
-        collided = False
-        for tile_rect, _ in tiles:
-            if self.rect.colliderect(tile_rect):
-                collided = True
-                # roll back
-                if self.dir > 0:
-                    self.rect.right = tile_rect.left
-                else:
-                    self.rect.left = tile_rect.right
-                self.dir *= -1
-                break
+    def assign_segment(self, nav):
+        # Stand on the platform segment under this enemy and patrol its full width
+        self.segment = nav.segment_under(self.rect.centerx, self.rect.bottom)
+        if self.segment:
+            self.rect.bottom = self.segment.y * TILE_SIZE
+            self.patrol_left = self.segment.x0 * TILE_SIZE
+            self.patrol_right = (self.segment.x1 + 1) * TILE_SIZE
+        else:
+            self.patrol_left = self.rect.left
+            self.patrol_right = self.rect.right
 
-        if not collided:
-            # check for edge: look slightly ahead at feet
-            ahead_x = self.rect.centerx + self.dir * (self.rect.width // 2 + 1)
-            foot_check_rect = pygame.Rect(ahead_x, self.rect.bottom + 1, 2, 2)
-            supported = False
-            for tile_rect, _ in tiles:
-                if foot_check_rect.colliderect(tile_rect):
-                    supported = True
-                    break
-            if not supported:
-                # reverse to avoid falling off platform
-                self.dir *= -1
+    def update_patrol(self):
+        # Walk back and forth, reversing at the ends of the platform segment
+        if self.patrol_right - self.patrol_left <= self.rect.width:
+            return
+        self.rect.x += int(self.dir * self.speed)
+        if self.rect.left <= self.patrol_left:
+            self.rect.left = self.patrol_left
+            self.dir = 1
+        elif self.rect.right >= self.patrol_right:
+            self.rect.right = self.patrol_right
+            self.dir = -1
 
     def try_shoot(self, player_center, bullets):
         # cooldown
@@ -140,14 +178,7 @@ class Enemy:
             vx = math.cos(angle) * ENEMY_BULLET_SPEED
             vy = math.sin(angle) * ENEMY_BULLET_SPEED
 
-            bullets.append({
-                "x": self.rect.centerx,
-                "y": self.rect.centery,
-                "vx": vx,
-                "vy": vy,
-                "rect": pygame.Rect(self.rect.centerx, self.rect.centery, BULLET_SIZE, BULLET_SIZE),
-                "owner": "enemy"
-            })
+            spawn_bullet(bullets, self.rect.centerx, self.rect.centery, vx, vy, "enemy")
             self.shoot_cd = ENEMY_SHOOT_COOLDOWN
 
     def draw(self, surf):
@@ -195,6 +226,83 @@ def load_all_levels():
         return False
 
 
+def add_level_run(asset_name, tx, ty, length, tiles, enemies):
+    py = int(ty * TILE_SIZE)
+    img = assets.get(asset_name)
+    for px in range(int(tx * TILE_SIZE), int((tx + length) * TILE_SIZE), TILE_SIZE):
+        if asset_name == "enemy":
+            enemies.append(Enemy(px, py, image=img))
+        else:
+            tiles.append((pygame.Rect(px, py, TILE_SIZE, TILE_SIZE), img))
+
+
+def get_level_file_mtime():
+    try:
+        return os.stat(LEVEL_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+def read_level_file():
+    # Like load_all_levels, but leaves ALL_LEVELS alone when the file can't be used
+    try:
+        with open(LEVEL_FILE, "r") as f:
+            levels = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(levels, list) or not levels:
+        return None
+    return levels
+
+
+def apply_level_diff(old_level, new_level, tiles, enemies):
+    # Patch the live tiles/enemies in place so the player and surviving enemies keep their state
+    old_cells = Counter(iter_tiles(old_level))
+    new_cells = Counter(iter_tiles(new_level))
+    removed = old_cells - new_cells
+    added = new_cells - old_cells
+    if not removed and not added:
+        return False
+
+    removed_tiles = Counter()
+    removed_spawns = set()
+    for (asset_name, tx, ty), count in removed.items():
+        if asset_name == "enemy":
+            removed_spawns.add((tx * TILE_SIZE, ty * TILE_SIZE))
+        else:
+            removed_tiles[(tx * TILE_SIZE, ty * TILE_SIZE, id(assets.get(asset_name)))] += count
+
+    if removed_tiles:
+        kept = []
+        for rect, img in tiles:
+            key = (rect.x, rect.y, id(img))
+            if removed_tiles[key] > 0:
+                removed_tiles[key] -= 1
+            else:
+                kept.append((rect, img))
+        tiles[:] = kept
+    if removed_spawns:
+        enemies[:] = [enemy for enemy in enemies if enemy.spawn not in removed_spawns]
+
+    for (asset_name, tx, ty), count in added.items():
+        for _ in range(count):
+            add_level_run(asset_name, tx, ty, 1, tiles, enemies)
+
+    build_level_nav(tiles, enemies)
+    print(f"Hot-reloaded level {CURRENT_LEVEL_INDEX + 1}: "
+          f"{sum(added.values())} tiles added, {sum(removed.values())} removed.")
+    return True
+
+
+def build_level_nav(tiles, enemies):
+    # Extract platform segments once per level load instead of scanning tiles every frame
+    global level_nav
+    solid_cells = {(rect.x // TILE_SIZE, rect.y // TILE_SIZE) for rect, _ in tiles}
+    level_nav = NavGraph(solid_cells, TILE_SIZE, JUMP_POWER, GRAVITY, MAX_FALL_SPEED, PLAYER_SPEED)
+    for enemy in enemies:
+        enemy.assign_segment(level_nav)
+
+
 def load_current_level():
     global CURRENT_LEVEL_INDEX
     if not ALL_LEVELS:
@@ -211,30 +319,27 @@ def load_current_level():
     tiles = []
     enemies = []
 
-    for t in level_data:
-        asset_name = t.get("asset")
-        tx = t.get("x", 0)
-        ty = t.get("y", 0)
-        px = int(tx * TILE_SIZE)
-        py = int(ty * TILE_SIZE)
-
-        if asset_name == "enemy":
-            img = assets.get("enemy")
-            enemies.append(Enemy(px, py, image=img))
-        else:
-            img = assets.get(asset_name)
-            rect = pygame.Rect(px, py, TILE_SIZE, TILE_SIZE)
-            tiles.append((rect, img))
+    # Runs are decoded straight into rects, whichever format the level was saved in
+    for asset_name, tx, ty, length in iter_runs(level_data):
+        add_level_run(asset_name, tx, ty, length, tiles, enemies)
 
+    build_level_nav(tiles, enemies)
     return tiles, enemies
 
 
 # Initial load of all level data
+level_nav = None  # NavGraph for the current level, see build_level_nav
+level_file_mtime = get_level_file_mtime()
+level_watch_timer = LEVEL_WATCH_INTERVAL
 load_all_levels()
 tiles, enemies = load_current_level()
 # ... (rest of your initialization)
 
-bullets = []  # list of dicts {x,y,vx,vy,rect,owner}
+bullets = []  # list of dicts {x,y,vx,vy,rect,owner,damage}, see spawn_bullet
+
+# Scratch lists reused every frame for bullet/enemy cleanup
+bullets_to_remove = []
+enemies_to_remove = []
 
 player = pygame.Rect(200, 100, TILE_SIZE, TILE_SIZE)
 player_color = (100, 200, 10)
@@ -252,6 +357,11 @@ player_direction = 1  # NEW: 1 for right, -1 for left (default right)
 player_health = PLAYER_MAX_HEALTH
 player_invuln = 0  # frames remaining invulnerability
 
+# HUD text is only re-rendered when the health value it shows changes
+hud_font = get_font("Arial", 14)
+hud_text = None
+hud_text_health = None
+
 
 def rects_collide(rect, rect_list):
     for r in rect_list:
@@ -294,12 +404,65 @@ def draw_health_bar(surf, x, y, w, h, current, maximum):
     pygame.draw.rect(surf, (200, 30, 30), (x, y, fill_w, h))
 
 
+# -----------------------
+# ALLOCATION MEASUREMENT (--measure-alloc)
+# -----------------------
+alloc_frames = 0
+alloc_peak_total = 0  # sum over frames of memory allocated above the frame's starting point
+alloc_window_start = 0  # traced memory at the start of the reporting window
+alloc_snapshot = None
+
+
+def take_alloc_snapshot():
+    # Leave out tracemalloc's own bookkeeping
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+
+
+def start_alloc_measurement():
+    global alloc_window_start, alloc_snapshot
+    tracemalloc.start()
+    alloc_snapshot = take_alloc_snapshot()
+    alloc_window_start = tracemalloc.get_traced_memory()[0]
+
+
+def begin_alloc_frame():
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def end_alloc_frame(frame_start):
+    global alloc_frames, alloc_peak_total, alloc_window_start, alloc_snapshot
+    current, peak = tracemalloc.get_traced_memory()
+    alloc_frames += 1
+    alloc_peak_total += peak - frame_start
+    if alloc_frames < FPS:
+        return
+
+    print(f"[alloc] {alloc_frames} frames: avg {alloc_peak_total / alloc_frames:.0f} B/frame transient, "
+          f"{(current - alloc_window_start) / alloc_frames:+.0f} B/frame retained")
+    snapshot = take_alloc_snapshot()
+    for stat in snapshot.compare_to(alloc_snapshot, "lineno")[:3]:
+        if stat.count_diff:
+            print("[alloc]   ", stat)
+    alloc_snapshot = snapshot
+    alloc_frames = 0
+    alloc_peak_total = 0
+    alloc_window_start = tracemalloc.get_traced_memory()[0]
+
+
+if MEASURE_ALLOCATIONS:
+    start_alloc_measurement()
+
 # -----------------------
 # MAIN LOOP
 # -----------------------
 running = True
 while running:
     dt = clock.tick(FPS) / 16
+    if MEASURE_ALLOCATIONS:
+        alloc_frame_start = begin_alloc_frame()
 
     # Decrease player shoot cooldown
     if player_shoot_cd > 0:
@@ -324,7 +487,7 @@ while running:
             if event.key == pygame.K_r:
                 # reload level and reset
                 tiles, enemies = load_current_level()
-                bullets.clear()
+                clear_bullets(bullets)
                 player.x, player.y = 200, 100
                 vel_y = 0
                 player_health = PLAYER_MAX_HEALTH
@@ -342,6 +505,23 @@ while running:
             if event.key == pygame.K_SPACE:
                 shoot_pressed = False
 
+    # -----------------------
+    # LEVEL HOT-RELOAD
+    # -----------------------
+    level_watch_timer -= 1
+    if level_watch_timer <= 0:
+        level_watch_timer = LEVEL_WATCH_INTERVAL
+        mtime = get_level_file_mtime()
+        if mtime != level_file_mtime:
+            new_levels = read_level_file()
+            # A half-written file fails to parse; keep the old mtime so it's retried next check
+            if new_levels is not None:
+                level_file_mtime = mtime
+                old_level = ALL_LEVELS[CURRENT_LEVEL_INDEX] if CURRENT_LEVEL_INDEX < len(ALL_LEVELS) else []
+                ALL_LEVELS = new_levels
+                if CURRENT_LEVEL_INDEX < len(ALL_LEVELS):
+                    apply_level_diff(old_level, ALL_LEVELS[CURRENT_LEVEL_INDEX], tiles, enemies)
+
     # Draw background
     if background_image:
         screen.blit(background_image, (0, 0))
@@ -360,15 +540,7 @@ while running:
         # Use player_direction for shooting
         shoot_vx = PLAYER_BULLET_SPEED * player_direction
 
-        bullets.append({
-            "x": player.centerx,
-            "y": player.centery,
-            "vx": shoot_vx,
-            "vy": 0,
-            "rect": pygame.Rect(player.centerx, player.centery, BULLET_SIZE, BULLET_SIZE),
-            "owner": "player",
-            "damage": PLAYER_BULLET_DAMAGE
-        })
+        spawn_bullet(bullets, player.centerx, player.centery, shoot_vx, 0, "player", PLAYER_BULLET_DAMAGE)
         player_shoot_cd = PLAYER_SHOOT_COOLDOWN
 
     # Player input -> movement
@@ -421,19 +593,7 @@ while running:
         if not enemy.alive:
             continue
 
-        # simple gravity for enemy (so they stay on platforms)
-        enemy.rect.y += 1  # small nudge to detect ground below
-        on_ground_enemy = False
-        for tile_rect, _ in tiles:
-            if enemy.rect.colliderect(tile_rect):
-                # if overlapping after nudge, revert and mark on ground
-                enemy.rect.bottom = tile_rect.top
-                on_ground_enemy = True
-                break
-        if not on_ground_enemy:
-            enemy.rect.y -= 1  # revert if not on ground
-
-        enemy.update_patrol(tiles)
+        enemy.update_patrol()
 
         # shooting
         enemy.try_shoot(player.center, bullets)
@@ -445,8 +605,8 @@ while running:
         b['rect'].y = int(b['y'])
 
     # Bullet collisions with tiles & entities
-    bullets_to_remove = []
-    enemies_to_remove = []  # NEW: for enemies that die this frame
+    bullets_to_remove.clear()
+    enemies_to_remove.clear()  # NEW: for enemies that die this frame
 
     for i, b in enumerate(bullets):
         # remove if out of screen
@@ -455,13 +615,15 @@ while running:
             continue
 
         # tile collisions
+        hit_tile = False
         for tile_rect, _ in tiles:
             if b['rect'].colliderect(tile_rect):
                 bullets_to_remove.append(i)
+                hit_tile = True
                 break
 
         # skip remaining checks if already marked for removal by tile collision
-        if i in bullets_to_remove:
+        if hit_tile:
             continue
 
         # entity collisions (Player or Enemy)
@@ -488,15 +650,14 @@ while running:
                         enemies_to_remove.append(j)
                     break
 
-    # Clean bullets in reverse order
-    for idx in sorted(set(bullets_to_remove), reverse=True):
-        if 0 <= idx < len(bullets):
-            bullets.pop(idx)
+    # Clean bullets in reverse order (indices were added in ascending order, each at most once)
+    for idx in reversed(bullets_to_remove):
+        bullet_pool.append(bullets.pop(idx))
 
     # Clean up dead enemies (in reverse order to avoid index issues)
-    for idx in sorted(set(enemies_to_remove), reverse=True):
-        if 0 <= idx < len(enemies):
-            enemies.pop(idx)
+    enemies_to_remove.sort(reverse=True)
+    for idx in enemies_to_remove:
+        enemies.pop(idx)
 
     # ... (after updating and cleaning up enemies/bullets)
 
@@ -507,7 +668,7 @@ while running:
         if CURRENT_LEVEL_INDEX + 1 < len(ALL_LEVELS):
             # Move to the next level
             CURRENT_LEVEL_INDEX += 1
-            bullets.clear()
+            clear_bullets(bullets)
 
             # Reset player to starting position (assuming a default start)
             player.x, player.y = 200, 100
@@ -519,8 +680,7 @@ while running:
 
         elif CURRENT_LEVEL_INDEX + 1 == len(ALL_LEVELS):
             # All levels completed!
-            fontbig = pygame.font.SysFont("Arial", 48)
-            t = fontbig.render("GAME COMPLETE!", True, (0, 255, 0))
+            t = render_text("GAME COMPLETE!", get_font("Arial", 48), (0, 255, 0))
             screen.blit(t, (WINDOW_WIDTH // 2 - t.get_width() // 2, WINDOW_HEIGHT // 2 - t.get_height() // 2))
 
             # Freeze the screen on "Game Complete"
@@ -590,14 +750,14 @@ while running:
     # Draw HUD: health
     draw_health_bar(screen, 10, 10, 120, 16, player_health, PLAYER_MAX_HEALTH)
     # health text
-    font = pygame.font.SysFont("Arial", 14)
-    text = font.render(f"HP: {player_health}/{PLAYER_MAX_HEALTH}  (R to reset)", True, (255, 255, 255))
-    screen.blit(text, (10, 30))
+    if hud_text_health != player_health:
+        hud_text = render_text(f"HP: {player_health}/{PLAYER_MAX_HEALTH}  (R to reset)", hud_font, (255, 255, 255))
+        hud_text_health = player_health
+    screen.blit(hud_text, (10, 30))
 
     # Check for death
     if player_health <= 0:
-        fontbig = pygame.font.SysFont("Arial", 36)
-        t = fontbig.render("YOU DIED - Press R to Restart", True, (255, 10, 10))
+        t = render_text("YOU DIED - Press R to Restart", get_font("Arial", 36), (255, 10, 10))
         screen.blit(t, (WINDOW_WIDTH // 2 - t.get_width() // 2, WINDOW_HEIGHT // 2 - t.get_height() // 2))
         # Freeze game updates except for restart input; continue loop so R works.
         pygame.display.update()
@@ -612,7 +772,7 @@ while running:
                     waiting = False
                     # reset state
                     tiles, enemies = load_current_level()
-                    bullets.clear()
+                    clear_bullets(bullets)
                     player.x, player.y = 200, 100
                     vel_y = 0
                     player_health = PLAYER_MAX_HEALTH
@@ -623,6 +783,9 @@ while running:
             clock.tick(15)
         continue
 
+    if MEASURE_ALLOCATIONS:
+        end_alloc_frame(alloc_frame_start)
+
     pygame.display.update()
 
 pygame.quit()
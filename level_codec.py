@@ -0,0 +1,87 @@
+# Compact level storage shared by the editor and the game.
+#
+# An encoded level looks like:
+#   {"format": "rle-chunks", "chunk_size": 16, "palette": ["cobblestone", "enemy", ...],
+#    "chunks": [[cx, cy, [x, y, length, asset_id, x, y, length, asset_id, ...]], ...]}
+# Each run is a horizontal strip of `length` copies of palette[asset_id] starting at the
+# chunk-local cell (x, y). Cells holding more than one asset get one run per stacked asset,
+# in placement order, so nothing the editor allows is lost.
+#
+# Older levels are plain lists of {"asset", "x", "y"} dicts and are still readable.
+
+RLE_FORMAT = "rle-chunks"
+CHUNK_SIZE = 16
+
+
+def encode_level(tiles, chunk_size=CHUNK_SIZE):
+    # tiles: iterable of (asset, x, y) in placement order
+    palette = []
+    palette_ids = {}
+    layers = []  # layers[i] maps (x, y) -> asset id of the i-th asset placed on that cell
+    depth = {}
+    for asset, x, y in tiles:
+        asset_id = palette_ids.get(asset)
+        if asset_id is None:
+            asset_id = palette_ids[asset] = len(palette)
+            palette.append(asset)
+        layer = depth.get((x, y), 0)
+        depth[(x, y)] = layer + 1
+        if layer == len(layers):
+            layers.append({})
+        layers[layer][(x, y)] = asset_id
+
+    chunks = {}  # (cx, cy) -> flat run list
+    for cells in layers:
+        run = None  # [x, y, length, asset_id] in world cells
+        for (x, y) in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+            asset_id = cells[(x, y)]
+            if (run and run[1] == y and run[3] == asset_id and run[0] + run[2] == x
+                    and x // chunk_size == run[0] // chunk_size):
+                run[2] += 1
+                continue
+            if run:
+                _add_run(chunks, run, chunk_size)
+            run = [x, y, 1, asset_id]
+        if run:
+            _add_run(chunks, run, chunk_size)
+
+    return {
+        "format": RLE_FORMAT,
+        "chunk_size": chunk_size,
+        "palette": palette,
+        "chunks": [[cx, cy, runs] for (cx, cy), runs in sorted(chunks.items())],
+    }
+
+
+def _add_run(chunks, run, chunk_size):
+    x, y, length, asset_id = run
+    cx, cy = x // chunk_size, y // chunk_size
+    chunks.setdefault((cx, cy), []).extend(
+        (x - cx * chunk_size, y - cy * chunk_size, length, asset_id))
+
+
+def is_encoded(level):
+    return isinstance(level, dict) and level.get("format") == RLE_FORMAT
+
+
+def iter_runs(level):
+    # Yield (asset, x, y, length) runs in world cell coordinates for either level format
+    if not is_encoded(level):
+        for t in level:
+            yield t.get("asset"), t.get("x", 0), t.get("y", 0), 1
+        return
+
+    size = level.get("chunk_size", CHUNK_SIZE)
+    palette = level["palette"]
+    for cx, cy, runs in level["chunks"]:
+        base_x = cx * size
+        base_y = cy * size
+        for i in range(0, len(runs), 4):
+            yield palette[runs[i + 3]], base_x + runs[i], base_y + runs[i + 1], runs[i + 2]
+
+
+def iter_tiles(level):
+    # Yield (asset, x, y) for every cell of a level in either format
+    for asset, x, y, length in iter_runs(level):
+        for dx in range(length):
+            yield asset, x + dx, y
@@ -0,0 +1,130 @@
+# Platform segments and jump links extracted from a level's tile grid at load time.
+#
+# A segment is a horizontal run of solid tiles in one row with free space directly above
+# them, i.e. somewhere a one-tile-tall entity can stand and walk. Segments are linked when
+# a jump (or walking off the edge) from one can land on the other under the game's physics;
+# tiles in the way of the jump arc are not checked.
+# Everything here is in tile cells; callers convert to pixels with tile_size.
+
+from collections import deque
+
+
+class PlatformSegment:
+    def __init__(self, index, y, x0, x1):
+        self.index = index
+        self.y = y  # tile row of the walkable surface
+        self.x0 = x0  # first tile column, inclusive
+        self.x1 = x1  # last tile column, inclusive
+        self.links = []  # segments reachable from this one by jumping or dropping
+
+    def __repr__(self):
+        return f"PlatformSegment(y={self.y}, x={self.x0}..{self.x1})"
+
+
+class NavGraph:
+    def __init__(self, solid_cells, tile_size, jump_power, gravity, max_fall_speed, run_speed):
+        self.tile_size = tile_size
+        self.jump_power = jump_power
+        self.gravity = gravity
+        self.max_fall_speed = max_fall_speed
+        self.run_speed = run_speed
+        self.segments = []
+        self.rows = {}  # tile row -> segments in that row, left to right
+        self._extract_segments(solid_cells)
+        self._link_segments()
+
+    def _extract_segments(self, solid_cells):
+        surface = {}
+        for x, y in solid_cells:
+            if (x, y - 1) not in solid_cells:
+                surface.setdefault(y, []).append(x)
+
+        for y in sorted(surface):
+            xs = sorted(surface[y])
+            start = prev = xs[0]
+            for x in xs[1:] + [None]:
+                if x is not None and x == prev + 1:
+                    prev = x
+                    continue
+                segment = PlatformSegment(len(self.segments), y, start, prev)
+                self.segments.append(segment)
+                self.rows.setdefault(y, []).append(segment)
+                start = prev = x
+
+    def max_rise(self):
+        # Highest a jump gets, in pixels
+        return self.jump_power * self.jump_power / (2 * self.gravity)
+
+    def jump_reach(self, rise):
+        # Horizontal pixels covered by a running jump that lands `rise` pixels above its
+        # start (negative for a drop), stepping the same per-frame physics as the player.
+        # Returns None if the height can't be reached.
+        if rise > self.max_rise():
+            return None
+        vel = -self.jump_power
+        height = 0.0
+        frames = 0
+        while True:
+            vel = min(vel + self.gravity, self.max_fall_speed)
+            height -= vel
+            frames += 1
+            if vel > 0 and height <= rise:
+                return frames * self.run_speed
+
+    def _link_segments(self):
+        ts = self.tile_size
+        max_rise_rows = int(self.max_rise() // ts)
+        reach_cache = {}
+        for a in self.segments:
+            for b in self.segments:
+                if a is b or b.y < a.y - max_rise_rows:
+                    continue
+                rise_rows = a.y - b.y
+                if rise_rows not in reach_cache:
+                    reach_cache[rise_rows] = self.jump_reach(rise_rows * ts)
+                reach = reach_cache[rise_rows]
+                if reach is None:
+                    continue
+                if b.x0 > a.x1:
+                    gap = (b.x0 - a.x1 - 1) * ts
+                elif b.x1 < a.x0:
+                    gap = (a.x0 - b.x1 - 1) * ts
+                else:
+                    gap = 0
+                if gap <= reach:
+                    a.links.append(b)
+
+    def segment_at(self, tx, ty):
+        # The segment whose surface is tile (tx, ty), if any
+        for segment in self.rows.get(ty, ()):
+            if segment.x0 <= tx <= segment.x1:
+                return segment
+        return None
+
+    def segment_under(self, px, bottom):
+        # The segment an entity whose feet are at pixel (px, bottom) is standing on
+        return self.segment_at(px // self.tile_size, bottom // self.tile_size)
+
+    def can_reach(self, start, goal):
+        return self.find_path(start, goal) is not None
+
+    def find_path(self, start, goal):
+        # Fewest-hops list of segments from start to goal (both included), or None
+        if start is goal:
+            return [start]
+        came_from = {start.index: None}
+        queue = deque([start])
+        while queue:
+            segment = queue.popleft()
+            for nxt in segment.links:
+                if nxt.index in came_from:
+                    continue
+                came_from[nxt.index] = segment
+                if nxt is goal:
+                    path = [goal]
+                    while came_from[path[-1].index] is not None:
+                        path.append(came_from[path[-1].index])
+                    path.reverse()
+                    return path
+                queue.append(nxt)
+        return None
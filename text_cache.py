@@ -0,0 +1,37 @@
+import pygame
+from collections import OrderedDict
+
+# Max number of rendered text surfaces kept around before the oldest is evicted
+TEXT_CACHE_SIZE = 64
+
+_fonts = {}  # (name, size) -> pygame.font.Font
+_rendered = OrderedDict()  # (text, font, color) -> Surface, oldest first
+
+
+def get_font(name, size):
+    # SysFont does a system font lookup, so only ever do it once per (name, size)
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+def render_text(text, font, color):
+    # Return a cached antialiased surface for text, rendering it on first use
+    key = (text, font, tuple(color))
+    surf = _rendered.get(key)
+    if surf is not None:
+        _rendered.move_to_end(key)
+        return surf
+
+    surf = font.render(text, True, color)
+    _rendered[key] = surf
+    if len(_rendered) > TEXT_CACHE_SIZE:
+        _rendered.popitem(last=False)
+    return surf
+
+
+def clear_text_cache():
+    _rendered.clear()